@@ -1,19 +1,32 @@
 import os
+import re
+import ssl
+import time
+import json
+import asyncio
 import logging
+import functools
+import tempfile
+import multiprocessing
+import threading
+from io import BytesIO
+import aiohttp
+import aiosmtplib
 import requests
-from datetime import datetime
-from flask import Flask, request
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential, before_sleep_log
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from flask import Flask, Response, request
 from twilio.rest import Client
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph
+from reportlab.lib.units import inch
+from reportlab.lib.utils import simpleSplit
 from reportlab.lib.styles import getSampleStyleSheet
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
-from apscheduler.schedulers.background import BackgroundScheduler
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from email.message import EmailMessage
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +43,10 @@ CONFIG = {
     'EMAIL_PASSWORD': os.getenv('EMAIL_PASSWORD'),
     'GOOGLE_CREDS_PATH': os.getenv('GOOGLE_CREDS_PATH', './credentials.json'),
     'SHEET_NAME': os.getenv('SHEET_NAME', 'Daily Brief Users'),
+    'USERS_CACHE_PATH': os.getenv(
+        'USERS_CACHE_PATH',
+        os.path.expanduser('~/.cache/presidents-brief/users.json')
+    ),
     'PORT': os.getenv('PORT', 5000)
 }
 
@@ -40,60 +57,49 @@ SCOPES = [
 ]
 
 # Initialize services
-creds = ServiceAccountCredentials.from_json_keyfile_name(CONFIG['GOOGLE_CREDS_PATH'], SCOPES)
-gc = gspread.authorize(creds)
 twilio_client = Client(CONFIG['TWILIO_ACCOUNT_SID'], CONFIG['TWILIO_AUTH_TOKEN'])
 
-# In-memory storage
-users = {}
-daily_requests = {}
+# One TLS context shared by every SMTP and HTTPS connection
+_SSL_CTX = ssl.create_default_context()
+_SSL_CTX.minimum_version = ssl.TLSVersion.TLSv1_2
 
-class User:
-    def __init__(self, row):
-        self.background = row.get('Background', '')
-        self.interests = [i.strip() for i in row.get('Interests', '').split(';') if i.strip()]
-        self.phone = row.get('Phone', '')
-        self.email = row.get('Email', '')
-        self.sources = [s.strip() for s in row.get('Preferred Sources', '').split(';') if s.strip()]
-        
-    def __repr__(self):
-        return f"<User {self.phone}>"
+# Messages sent over one SMTP connection before it is recycled
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100
 
-def load_users():
-    """Load users from Google Sheet with error handling"""
-    try:
-        sheet = gc.open(CONFIG['SHEET_NAME']).sheet1
-        records = sheet.get_all_records()
-        
-        new_users = {}
-        for idx, row in enumerate(records, start=2):
-            try:
-                if not row.get('Phone') or not row.get('Email'):
-                    continue
-                
-                user = User(row)
-                new_users[user.phone] = user
-            except Exception as e:
-                logger.error(f"Error processing row {idx}: {e}")
-                continue
-                
-        users.clear()
-        users.update(new_users)
-        logger.info(f"Loaded {len(users)} users")
-    except Exception as e:
-        logger.error(f"Failed to load users: {e}")
+# Seconds before a stalled SMTP connect or command is abandoned
+SMTP_TIMEOUT = 30
 
-def generate_briefing(user, special_request=None):
-    """Generate news briefing using Perplexity API"""
-    prompt = f"""
-    Create a daily news briefing for a user with these characteristics:
-    
-    Background: {user.background}
-    Interests: {', '.join(user.interests)}
-    Preferred Sources: {', '.join(user.sources) or 'None specified'}
-    
-    Today's Special Request: {special_request or 'None'}
-    
+# Persistent SMTP connections shared by the daily batch; kept well under
+# Gmail's ~15 concurrent connection limit
+SMTP_POOL_SIZE = 5
+
+# Perplexity requests in flight at once during the daily batch
+PERPLEXITY_CONCURRENCY = 16
+
+# Topic digests sharing one batched Perplexity request; each gets its own max_tokens budget
+BRIEFING_BATCH_SIZE = 4
+BRIEFING_MAX_TOKENS = 2000
+
+# Budget for the short per-user answer to a WhatsApp special request
+SPECIAL_REQUEST_MAX_TOKENS = 500
+
+# Transient HTTP statuses from Perplexity and the Sheets API worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Attempts per external call, waiting 2s, 4s, 8s... (capped at 30s) between them
+RETRY_ATTEMPTS = 4
+
+# Seconds the users cache is trusted before re-checking the sheet's modifiedTime
+USERS_CACHE_TTL = 3600
+
+# Topic fields substituted into the digest prompts
+_TOPICS_TEMPLATE = """
+    Interests: {interests}
+    Preferred Sources: {sources}
+    """
+
+# Guidelines shared by the single and batched digest prompts
+_GUIDELINES = """
     ## General Guidelines
 
     **Story Selection & Organization**
@@ -125,126 +131,611 @@ def generate_briefing(user, special_request=None):
     - Note specifically where accounts differ
     - Identify potential reasons for discrepancies
     """
+
+# One digest is written per distinct interests/sources set and shared by
+# every user who has that set
+_DIGEST_TEMPLATE = """
+    Create a daily news briefing for readers with these interests:
+    """ + _TOPICS_TEMPLATE + _GUIDELINES
+
+# Batched prompt; {topics} holds one "Topic ID" block per digest
+_BATCH_PROMPT_TEMPLATE = """
+    Create a separate daily news briefing for each of the following topic sets.
+    Each briefing must stand on its own and follow the guidelines below.
+    {topics}
+    Respond with a JSON object whose "briefings" array holds one entry per topic set,
+    with "id" set to the Topic ID and "content" set to that briefing.
+    """ + _GUIDELINES
+
+# Personal layer on top of the shared digest
+_PREFACE_TEMPLATE = "Prepared for: {background}"
+
+_SPECIAL_REQUEST_TEMPLATE = """
+    A reader with this background asked for today's news briefing to cover
+    something specific.
     
-    try:
-        headers = {
-            'Authorization': f'Bearer {CONFIG["PERPLEXITY_API_KEY"]}',
-            'Content-Type': 'application/json'
-        }
-        
-        data = {
-            'model': 'pplx-70b-chat',
-            'messages': [{'role': 'user', 'content': prompt}],
-            'temperature': 0.2,
-            'max_tokens': 2000
+    Background: {background}
+    Special Request: {special_request}
+    
+    Answer the request in a few short paragraphs. Lead with core facts, use
+    precise, neutral language and cite specific sources for all claims.
+    """
+
+_BATCH_RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'briefings': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'id': {'type': 'string'},
+                            'content': {'type': 'string'}
+                        },
+                        'required': ['id', 'content']
+                    }
+                }
+            },
+            'required': ['briefings']
         }
+    }
+}
+
+# PDF styles are built once and shared by every briefing
+_STYLES = getSampleStyleSheet()
+_TITLE = _STYLES['Title']
+_BODY = _STYLES['BodyText']
+_PAGE_WIDTH, _PAGE_HEIGHT = letter
+_MARGIN = inch
+_TEXT_WIDTH = _PAGE_WIDTH - 2 * _MARGIN
+_SECTION_RE = re.compile(r'\n\n+')
+
+# Twilio sends WhatsApp senders as "whatsapp:+<E.164 number>"
+_FROM_RE = re.compile(r'^whatsapp:(\+\d+)$')
+
+# In-memory storage
+users = {}
+daily_requests = {}
+_digest_cache = {}
+
+# Guards users and daily_requests, shared by Flask handlers and the batch loop
+_USERS_LOCK = threading.RLock()
+
+def _is_transient_http_error(e):
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status in RETRY_STATUSES
+    return isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+def _is_transient_smtp_error(e):
+    # 4xx replies (421, 450, 451...) are temporary by definition in SMTP
+    if isinstance(e, aiosmtplib.SMTPResponseException):
+        return 400 <= e.code < 500
+    return isinstance(e, (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError, OSError))
+
+def _is_transient_sheets_error(e):
+    if isinstance(e, gspread.exceptions.APIError):
+        return e.response.status_code in RETRY_STATUSES
+    return isinstance(e, requests.ConnectionError)
+
+def _transient_retry(predicate):
+    """Retry with exponential backoff while predicate(exception) holds"""
+    return retry(
+        stop=stop_after_attempt(RETRY_ATTEMPTS),
+        wait=wait_exponential(multiplier=2, max=30),
+        retry=retry_if_exception(predicate),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True
+    )
+
+class User:
+    def __init__(self, row):
+        self.background = row.get('Background', '')
+        self.interests = [i.strip() for i in row.get('Interests', '').split(';') if i.strip()]
+        self.phone = row.get('Phone', '')
+        self.email = row.get('Email', '')
+        self.sources = [s.strip() for s in row.get('Preferred Sources', '').split(';') if s.strip()]
+        self._interests_csv = ', '.join(self.interests)
+        self._sources_csv = ', '.join(self.sources) or 'None specified'
         
-        response = requests.post(
-            'https://api.perplexity.ai/v1/chat/completions',
-            headers=headers,
-            json=data
+    def __repr__(self):
+        return f"<User {self.phone}>"
+
+class SMTPSession:
+    """Authenticated Gmail SMTP connection reused across messages"""
+    def __init__(self, max_messages=SMTP_MAX_MESSAGES_PER_CONNECTION):
+        self.max_messages = max_messages
+        self.server = None
+        self.sent = 0
+
+    async def connect(self):
+        """Open and authenticate a connection; self.server is only set on success"""
+        server = aiosmtplib.SMTP(
+            hostname='smtp.gmail.com',
+            port=465,
+            use_tls=True,
+            tls_context=_SSL_CTX,
+            timeout=SMTP_TIMEOUT
         )
+        try:
+            await server.connect()
+            await server.login(CONFIG['EMAIL_USER'], CONFIG['EMAIL_PASSWORD'])
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.sent = 0
+
+    async def close(self):
+        if self.server is None:
+            return
+        try:
+            await self.server.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+
+    @_transient_retry(_is_transient_smtp_error)
+    async def send_message(self, msg):
+        """Send a message, reconnecting before each retry of a failed session"""
+        if self.server is None or self.sent >= self.max_messages:
+            await self.close()
+            await self.connect()
+        try:
+            await self.server.send_message(msg)
+        except Exception:
+            await self.close()
+            raise
+        self.sent += 1
+
+def _read_users_cache():
+    """Return the cached sheet rows, or None if the cache is missing or unreadable"""
+    try:
+        with open(CONFIG['USERS_CACHE_PATH'], encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if {'modified_time', 'checked_at', 'rows'} <= cache.keys() else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable users cache: {e}")
+        return None
+
+def _write_users_cache(modified_time, rows):
+    """Atomically replace the users cache, tagged with the sheet's modifiedTime"""
+    path = CONFIG['USERS_CACHE_PATH']
+    cache_dir = os.path.dirname(path) or '.'
+    try:
+        # Private directory and an unpredictable temp name, so other local
+        # users can neither plant the cache nor redirect the write
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'modified_time': modified_time,
+                    'checked_at': time.time(),
+                    'rows': rows
+                }, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Failed to write users cache: {e}")
+
+def _fetch_rows(sheet):
+    """Return every data row of the sheet as a dict of column name to cell"""
+    # One raw values call; the header row maps column names to positions
+    values = sheet.get_values()
+    if not values:
+        return []
+    header = values[0]
+    return [dict(zip(header, cells)) for cells in values[1:]]
+
+def _build_users(rows):
+    """Parse sheet rows into Users, keyed by phone"""
+    new_users = {}
+    for idx, row in enumerate(rows, start=2):
+        try:
+            if not row.get('Phone') or not row.get('Email'):
+                continue
+            
+            user = User(row)
+            new_users[user.phone] = user
+        except Exception as e:
+            logger.error(f"Error processing row {idx}: {e}")
+            continue
+    
+    return new_users
+
+@functools.lru_cache(maxsize=1)
+def _get_gc():
+    """Authorize gspread on first use instead of at import"""
+    return gspread.service_account(filename=CONFIG['GOOGLE_CREDS_PATH'], scopes=SCOPES)
+
+@_transient_retry(_is_transient_sheets_error)
+def _refresh_users(cache):
+    """Re-check the sheet, re-authorizing once if Google rejects the credentials"""
+    try:
+        return _sync_users(_get_gc(), cache)
+    except gspread.exceptions.APIError as e:
+        if e.response.status_code != 401:
+            raise
+        logger.warning("Google credentials rejected, re-authorizing")
+        _get_gc.cache_clear()
+        return _sync_users(_get_gc(), cache)
+
+def _sync_users(gc, cache):
+    """Re-check the sheet's modifiedTime and download it only if it changed"""
+    # The Drive listing returns id and modifiedTime in one call, so an
+    # unchanged sheet is never opened
+    files = gc.list_spreadsheet_files(CONFIG['SHEET_NAME'])
+    if not files:
+        raise gspread.exceptions.SpreadsheetNotFound(CONFIG['SHEET_NAME'])
+    modified_time = files[0]['modifiedTime']
+    
+    if cache and cache['modified_time'] == modified_time:
+        rows = cache['rows']
+    else:
+        rows = _fetch_rows(gc.open_by_key(files[0]['id']).sheet1)
+    
+    _write_users_cache(modified_time, rows)
+    return rows
+
+def load_users():
+    """Load users from Google Sheet, re-downloading only when it has changed"""
+    try:
+        cache = _read_users_cache()
+        if cache and time.time() - cache['checked_at'] < USERS_CACHE_TTL:
+            rows = cache['rows']
+        else:
+            rows = _refresh_users(cache)
+        new_users = _build_users(rows)
+                
+        with _USERS_LOCK:
+            users.clear()
+            users.update(new_users)
+        logger.info(f"Loaded {len(new_users)} users")
+    except Exception as e:
+        logger.error(f"Failed to load users: {e}")
+
+def _digest_key(user):
+    """Cache key shared by users with the same interests and sources today"""
+    return (
+        date.today(),
+        frozenset(i.lower() for i in user.interests),
+        frozenset(s.lower() for s in user.sources)
+    )
+
+def _topic_key(user):
+    """Sort key that places similar interests and sources next to each other"""
+    return (
+        tuple(sorted(i.lower() for i in user.interests)),
+        tuple(sorted(s.lower() for s in user.sources))
+    )
+
+@_transient_retry(_is_transient_http_error)
+async def _post_completion(session, prompt, max_tokens, response_format=None):
+    """POST one chat completion, retrying transient failures, and return its text"""
+    data = {
+        'model': 'pplx-70b-chat',
+        'messages': [{'role': 'user', 'content': prompt}],
+        'temperature': 0.2,
+        'max_tokens': max_tokens
+    }
+    if response_format:
+        data['response_format'] = response_format
+    
+    async with session.post(
+        'https://api.perplexity.ai/v1/chat/completions',
+        json=data
+    ) as response:
         response.raise_for_status()
-        
-        return response.json()['choices'][0]['message']['content']
+        result = await response.json()
+    
+    return result['choices'][0]['message']['content']
+
+async def _generate_digest(session, user):
+    """Generate one topic digest, or None if the API call fails"""
+    prompt = _DIGEST_TEMPLATE.format_map({
+        'interests': user._interests_csv,
+        'sources': user._sources_csv
+    })
+    
+    try:
+        return await _post_completion(session, prompt, BRIEFING_MAX_TOKENS)
     except Exception as e:
         logger.error(f"Perplexity API error: {e}")
+        return None
+
+async def generate_topic_digest(session, user):
+    """Return today's digest for the user's interests, generating it at most once"""
+    key = _digest_key(user)
+    if key not in _digest_cache:
+        _digest_cache[key] = asyncio.ensure_future(_generate_digest(session, user))
+    
+    digest = await _digest_cache[key]
+    if digest is None:
+        # Let a later caller retry instead of caching the failure
+        _digest_cache.pop(key, None)
+    return digest
+
+async def generate_digests_batch_async(session, group):
+    """Generate digests for several users' topic sets in one call
+    
+    Returns digests aligned with group. None marks a topic set the response
+    left out, so it is generated on its own later.
+    """
+    topics = ''.join(
+        f"\n    Topic ID: {n}" + _TOPICS_TEMPLATE.format_map({
+            'interests': user._interests_csv,
+            'sources': user._sources_csv
+        })
+        for n, user in enumerate(group)
+    )
+    prompt = _BATCH_PROMPT_TEMPLATE.format_map({'topics': topics})
+    
+    try:
+        content = await _post_completion(
+            session, prompt, BRIEFING_MAX_TOKENS * len(group), _BATCH_RESPONSE_FORMAT
+        )
+        digests = {str(entry['id']): entry['content'] for entry in json.loads(content)['briefings']}
+    except Exception as e:
+        logger.error(f"Perplexity batch error, falling back to single requests: {e}")
+        return [None] * len(group)
+    
+    return [digests.get(str(n)) or None for n in range(len(group))]
+
+async def generate_briefing_async(session, user, special_request=None):
+    """Compose a briefing from the shared topic digest and a personal layer"""
+    digest = await generate_topic_digest(session, user)
+    if digest is None:
         return "Error generating briefing. Please try again later."
+    
+    parts = []
+    if user.background:
+        parts.append(_PREFACE_TEMPLATE.format_map({'background': user.background}))
+    
+    if special_request:
+        prompt = _SPECIAL_REQUEST_TEMPLATE.format_map({
+            'background': user.background or 'None specified',
+            'special_request': special_request
+        })
+        try:
+            answer = await _post_completion(session, prompt, SPECIAL_REQUEST_MAX_TOKENS)
+            parts.append(f"Today's Special Request: {special_request}\n{answer}")
+        except Exception as e:
+            logger.error(f"Perplexity API error for special request: {e}")
+    
+    parts.append(digest)
+    return '\n\n'.join(parts)
+
+async def _prefetch_digests(batch, limited):
+    """Fill the digest cache for every new topic set, batching several per call"""
+    pending = {}
+    for user, _ in batch:
+        key = _digest_key(user)
+        if key not in _digest_cache:
+            pending.setdefault(key, user)
+    
+    # Neighbouring topic sets share a request so each batched prompt stays
+    # coherent; a lone set gains nothing from batching and is left to
+    # generate_topic_digest
+    items = sorted(pending.items(), key=lambda item: _topic_key(item[1]))
+    groups = [items[i:i + BRIEFING_BATCH_SIZE] for i in range(0, len(items), BRIEFING_BATCH_SIZE)]
+    groups = [group for group in groups if len(group) > 1]
+    results = await asyncio.gather(*(
+        limited(generate_digests_batch_async, [user for _, user in group])
+        for group in groups
+    ))
+    
+    loop = asyncio.get_running_loop()
+    for group, digests in zip(groups, results):
+        for (key, _), digest in zip(group, digests):
+            if digest is not None:
+                _digest_cache[key] = loop.create_future()
+                _digest_cache[key].set_result(digest)
 
-def create_pdf(content, filename):
-    """Create PDF with proper formatting"""
+async def _generate_briefings(batch):
+    """Generate briefings for (user, special_request) pairs concurrently"""
+    semaphore = asyncio.Semaphore(PERPLEXITY_CONCURRENCY)
+    connector = aiohttp.TCPConnector(
+        limit=PERPLEXITY_CONCURRENCY,
+        keepalive_timeout=60,
+        ttl_dns_cache=300,
+        ssl=_SSL_CTX
+    )
+    headers = {
+        'Authorization': f'Bearer {CONFIG["PERPLEXITY_API_KEY"]}',
+        'Content-Type': 'application/json'
+    }
+    
+    # Digests are only valid for the day they were written
+    today = date.today()
+    for key in [key for key in _digest_cache if key[0] != today]:
+        del _digest_cache[key]
+    
+    # One pooled session per batch so TCP+TLS is set up once, not per user
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        async def limited(generate, *args):
+            async with semaphore:
+                return await generate(session, *args)
+        
+        await _prefetch_digests(batch, limited)
+        
+        # Topic sets the batched calls missed are generated singly, at most once each
+        return await asyncio.gather(*(limited(generate_briefing_async, user, req) for user, req in batch))
+
+def _split_long_line(line):
+    """Break a line with no usable spaces (e.g. a URL) by characters"""
+    pieces = []
+    start = 0
+    for end in range(1, len(line) + 1):
+        if stringWidth(line[start:end], _BODY.fontName, _BODY.fontSize) > _TEXT_WIDTH and end - 1 > start:
+            pieces.append(line[start:end - 1])
+            start = end - 1
+    pieces.append(line[start:])
+    return pieces
+
+def _wrap_section(section):
+    """Break a section into lines that fit the body text width"""
+    lines = []
+    for line in section.split('\n'):
+        for wrapped in simpleSplit(line, _BODY.fontName, _BODY.fontSize, _TEXT_WIDTH) or ['']:
+            if stringWidth(wrapped, _BODY.fontName, _BODY.fontSize) > _TEXT_WIDTH:
+                lines.extend(_split_long_line(wrapped))
+            else:
+                lines.append(wrapped)
+    return lines
+
+@functools.lru_cache(maxsize=1)
+def _get_pdf_pool():
+    """Start the PDF worker pool on first use instead of at import
+    
+    reportlab layout is CPU-bound and GIL-bound, so PDFs render in worker
+    processes. Workers come from a forkserver, never by forking this
+    multi-threaded process directly.
+    """
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context('forkserver')
+    )
+
+# PDFs live only in memory from render to SMTP DATA; nothing is written to
+# or unlinked from disk, so the batch issues no per-user file syscalls
+def create_pdf_bytes(content):
+    """Render the briefing to an in-memory PDF and return its bytes"""
     try:
-        doc = SimpleDocTemplate(filename, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
+        buf = BytesIO()
+        # Flate-compress page streams explicitly rather than trusting rl_config;
+        # text briefs shrink ~4-5x, which is what crosses SMTP DATA as base64
+        pdf = canvas.Canvas(buf, pagesize=letter, pageCompression=1)
         
-        # Add title
-        title = Paragraph(f"Daily Brief - {datetime.now().strftime('%Y-%m-%d')}", styles['Title'])
-        story.append(title)
+        # Every brief is one centred title followed by plain text sections,
+        # so lines are placed directly instead of going through Platypus layout
+        y = _PAGE_HEIGHT - _MARGIN - _TITLE.leading
+        pdf.setFont(_TITLE.fontName, _TITLE.fontSize)
+        pdf.drawCentredString(_PAGE_WIDTH / 2, y, f"Daily Brief - {datetime.now().strftime('%Y-%m-%d')}")
+        y -= _TITLE.spaceAfter
         
         # Process content
-        for section in content.split('\n\n'):
-            if section.strip():
-                p = Paragraph(section.replace('\n', '<br/>'), styles['BodyText'])
-                story.append(p)
+        pdf.setFont(_BODY.fontName, _BODY.fontSize)
+        for section in _SECTION_RE.split(content):
+            if not section.strip():
+                continue
+            
+            y -= _BODY.spaceBefore
+            for line in _wrap_section(section):
+                y -= _BODY.leading
+                if y < _MARGIN:
+                    pdf.showPage()
+                    pdf.setFont(_BODY.fontName, _BODY.fontSize)
+                    y = _PAGE_HEIGHT - _MARGIN - _BODY.leading
+                pdf.drawString(_MARGIN, y, line)
         
-        doc.build(story)
-        return filename
+        pdf.save()
+        return buf.getvalue()
     except Exception as e:
         logger.error(f"PDF creation failed: {e}")
         raise
 
-def send_email(user, pdf_path):
-    """Send email with PDF attachment"""
+async def send_email(pool, user, pdf_bytes):
+    """Send email with PDF attachment over a pooled SMTPSession"""
     try:
-        msg = MIMEMultipart()
+        msg = EmailMessage()
         msg['From'] = CONFIG['EMAIL_USER']
         msg['To'] = user.email
         msg['Subject'] = f"Your Daily Brief - {datetime.now().strftime('%Y-%m-%d')}"
         
-        body = MIMEText("""Here's your personalized daily news briefing.
+        msg.set_content("""Here's your personalized daily news briefing.
                         Reply to this email with any feedback!""")
-        msg.attach(body)
         
-        with open(pdf_path, 'rb') as f:
-            part = MIMEApplication(f.read(), Name=os.path.basename(pdf_path))
-            part['Content-Disposition'] = f'attachment; filename="{os.path.basename(pdf_path)}"'
-            msg.attach(part)
+        filename = f"brief_{datetime.now().strftime('%Y%m%d')}.pdf"
+        msg.add_attachment(pdf_bytes, maintype='application', subtype='pdf', filename=filename)
         
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(CONFIG['EMAIL_USER'], CONFIG['EMAIL_PASSWORD'])
-            server.sendmail(CONFIG['EMAIL_USER'], user.email, msg.as_string())
+        server = await pool.get()
+        try:
+            await server.send_message(msg)
+        finally:
+            pool.put_nowait(server)
             
         logger.info(f"Email sent to {user.email}")
     except Exception as e:
         logger.error(f"Failed to send email to {user.email}: {e}")
 
+def _twiml(message):
+    """Wrap a reply in a TwiML XML response"""
+    return Response(f'<Response><Message>{message}</Message></Response>', mimetype='application/xml')
+
 @app.route('/whatsapp', methods=['POST'])
 def handle_whatsapp():
     """Handle incoming WhatsApp messages"""
     try:
-        from_number = request.form.get('From', '').split(':')[1]
+        match = _FROM_RE.match(request.form.get('From', ''))
+        if not match:
+            return _twiml('Error processing request')
+        
+        from_number = match.group(1)
         message = request.form.get('Body', '').strip()
         
-        if from_number in users:
-            daily_requests[from_number] = message
+        with _USERS_LOCK:
+            registered = from_number in users
+            if registered:
+                daily_requests[from_number] = message
+        
+        if registered:
             logger.info(f"Received request from {from_number}: {message}")
-            return '<Response><Message>Request received! You\'ll get it in your next briefing.</Message></Response>'
+            return _twiml('Request received! You\'ll get it in your next briefing.')
             
-        return '<Response><Message>⚠️ Not a registered user</Message></Response>'
+        return _twiml('⚠️ Not a registered user')
     except Exception as e:
         logger.error(f"WhatsApp handler error: {e}")
-        return '<Response><Message>Error processing request</Message></Response>'
+        return _twiml('Error processing request')
 
-def send_daily_briefings():
+async def _process_user(pool, phone, user, content):
+    """Render and email one user's briefing"""
+    try:
+        if not content:
+            return
+        
+        # Create PDF in a worker process, off the event loop
+        loop = asyncio.get_running_loop()
+        pdf_bytes = await loop.run_in_executor(_get_pdf_pool(), create_pdf_bytes, content)
+        
+        # Send email
+        await send_email(pool, user, pdf_bytes)
+        
+    except Exception as e:
+        logger.error(f"Failed to process user {phone}: {e}")
+
+async def send_daily_briefings_async():
     """Main function to send all briefings"""
     try:
-        load_users()  # Refresh user data
+        await asyncio.to_thread(load_users)  # Refresh user data
         logger.info("Starting daily briefing process")
         
-        for phone, user in users.items():
-            try:
-                # Get special request and clear it
-                special_request = daily_requests.pop(phone, None)
-                
-                # Generate content
-                content = generate_briefing(user, special_request)
-                if not content:
-                    continue
-                
-                # Create PDF
-                pdf_file = f"{phone}_{datetime.now().strftime('%Y%m%d')}.pdf"
-                pdf_path = create_pdf(content, pdf_file)
-                
-                # Send email
-                send_email(user, pdf_path)
-                
-                # Cleanup
-                os.remove(pdf_path)
-                
-            except Exception as e:
-                logger.error(f"Failed to process user {phone}: {e}")
-                continue
+        # Snapshot users and take their special requests in one step
+        with _USERS_LOCK:
+            batch = [(phone, user, daily_requests.pop(phone, None)) for phone, user in users.items()]
+        
+        # Generate all content concurrently
+        contents = await _generate_briefings([(user, req) for _, user, req in batch])
+        
+        # Senders take a connection off the pool and put it back when done
+        sessions = [SMTPSession() for _ in range(SMTP_POOL_SIZE)]
+        pool = asyncio.Queue()
+        for session in sessions:
+            pool.put_nowait(session)
+        
+        try:
+            await asyncio.gather(*(
+                _process_user(pool, phone, user, content)
+                for (phone, user, _), content in zip(batch, contents)
+            ))
+        finally:
+            await asyncio.gather(*(session.close() for session in sessions))
                 
         logger.info("Daily briefing process completed")
     except Exception as e:
@@ -254,10 +745,14 @@ if __name__ == '__main__':
     # Initial setup
     load_users()
     
+    # The scheduler and the batch share one event loop on a background thread
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name='briefing-loop', daemon=True).start()
+    
     # Schedule daily at 2pm
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(send_daily_briefings, 'cron', hour=14, timezone='UTC')
+    scheduler = AsyncIOScheduler(event_loop=loop)
+    scheduler.add_job(send_daily_briefings_async, 'cron', hour=14, timezone='UTC')
     scheduler.start()
     
     # Start Flask server
-    app.run(host='0.0.0.0', port=CONFIG['PORT'])
\ No newline at end of file
+    app.run(host='0.0.0.0', port=CONFIG['PORT'])